@@ -1,16 +1,29 @@
 import pandas as pd
 
+import instrumentation as metrics
+
 # === CONFIGURATION ===
 MASTER_FILE = "energy_access_master.csv"
 INCOME_FILE = "state_median_income_2024.csv"
 OUTPUT_FILE = "energy_access_with_burden.csv"
 
+def add_burden(master, income):
+    """Merge state median income and compute energy burden (% of income spent on electricity)."""
+    master = master.merge(income[['state', 'median_income_2024']], on='state', how='left')
+    
+    # Calculate energy burden using estimated annual bill
+    # Energy burden = (annual electricity bill / median household income) * 100
+    master['energy_burden_pct'] = (master['est_annual_bill'] / master['median_income_2024']) * 100
+    return master
+
+@metrics.instrument("burden")
 def main():
     print("=== ADDING ENERGY BURDEN ===\n")
     
     # Load master data
     print("Loading master data...")
-    master = pd.read_csv(MASTER_FILE)
+    with metrics.span("read_master"):
+        master = pd.read_csv(MASTER_FILE)
     print(f"  Rows: {len(master):,}")
     
     # Load income data
@@ -18,15 +31,13 @@ def main():
     income = pd.read_csv(INCOME_FILE)
     print(f"  States: {len(income)}")
     
-    # Merge income
-    master = master.merge(income[['state', 'median_income_2024']], on='state', how='left')
-    
-    # Calculate energy burden using estimated annual bill
-    # Energy burden = (annual electricity bill / median household income) * 100
-    master['energy_burden_pct'] = (master['est_annual_bill'] / master['median_income_2024']) * 100
+    # Merge income and calculate burden
+    master = add_burden(master, income)
     
     # Save
-    master.to_csv(OUTPUT_FILE, index=False)
+    with metrics.span("write_csv"):
+        master.to_csv(OUTPUT_FILE, index=False)
+    metrics.count("rows_written", len(master))
     print(f"\nSaved: {OUTPUT_FILE}")
     
     # === PREVIEW 2024 DATA ===
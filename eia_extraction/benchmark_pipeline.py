@@ -0,0 +1,198 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from generate_synthetic_data import generate
+
+# === CONFIGURATION ===
+BENCH_DIR = "bench_data"
+RESULTS_FILE = "benchmark_results.json"
+SCALES = [1, 10, 100]
+REGRESSION_THRESHOLD = 1.20  # Flag stages more than 20% slower than the baseline
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (stage, module, file whose rows count as the stage's records)
+STAGES = [
+    ("extract", "extract_access_series", "elec.txt"),
+    ("extract_seds", "extract_seds_burden", "SEDS.txt"),
+    ("extract_reliability", "extract_reliability", "reliability_by_utility.csv"),
+    ("flatten", "flatten_to_panel", "energy_access_panel.csv"),
+    ("merge", "merge_all_data", "energy_access_panel.csv"),
+    ("burden", "add_energy_burden", "energy_access_master.csv"),
+    ("merge_out_of_core", "merge_out_of_core", "energy_access_panel.csv"),
+    ("visualize", "visualize_energy_access", "energy_access_with_burden.csv"),
+]
+
+def count_lines(path):
+    count = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+    return count
+
+# Runs one stage, then writes the child's own peak RSS (kB) to argv[2].
+# VmHWM restarts at exec, so unlike ru_maxrss from wait4 it does not include
+# the RSS this (pandas-loaded) benchmark process had when it spawned the child.
+# Worker pools the stage started and joined (merge_out_of_core) are counted too.
+STAGE_RUNNER = """
+import resource, sys
+module, peak_file = sys.argv[1], sys.argv[2]
+__import__(module).main()
+try:
+    with open('/proc/self/status') as f:
+        own_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    sys.exit(0)
+workers_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+with open(peak_file, 'w') as f:
+    f.write(str(max(own_kb, workers_kb)))
+"""
+
+def peak_rss_mb(rusage):
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return rusage.ru_maxrss * scale / (1024 * 1024)
+
+def run_stage(module, workdir):
+    """Run one stage's main() in a fresh interpreter; return (wall seconds, peak RSS MB)."""
+    env = dict(os.environ, PYTHONPATH=SCRIPT_DIR, MPLBACKEND="Agg")
+
+    with tempfile.TemporaryFile() as stderr, tempfile.TemporaryDirectory() as tmp:
+        peak_file = os.path.join(tmp, "peak_kb")
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", STAGE_RUNNER, module, peak_file],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr,
+        )
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+
+        if os.waitstatus_to_exitcode(status) != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"{module} failed:\n{stderr.read().decode()}")
+
+        if os.path.exists(peak_file):
+            with open(peak_file, 'r', encoding='utf-8') as f:
+                return wall, int(f.read()) / 1024
+
+    # No /proc (e.g. macOS): ru_maxrss, which may include RSS inherited from this process
+    return wall, peak_rss_mb(rusage)
+
+def generate_args(scale):
+    """Every argument generate() runs with at this scale, module defaults included."""
+    bound = inspect.signature(generate).bind(scale=scale)
+    bound.apply_defaults()
+    args = dict(bound.arguments)
+    del args["output_dir"]
+    return args
+
+def prepare_inputs(scale):
+    """Generate inputs for this scale, reusing them if generate() ran with the same arguments before."""
+    workdir = os.path.join(BENCH_DIR, f"scale_{scale}")
+    params_path = os.path.join(workdir, "params.json")
+    args = generate_args(scale)
+
+    if os.path.exists(params_path):
+        with open(params_path, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        if params.get("generate_args") == args:
+            return workdir, params
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"  Generating {scale}x inputs...")
+    params = dict(generate(workdir, **args), generate_args=args)
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=2)
+    return workdir, params
+
+def run_scale(scale):
+    workdir, params = prepare_inputs(scale)
+    results = []
+
+    for stage, module, records_file in STAGES:
+        wall, rss = run_stage(module, workdir)
+
+        if stage == "extract_reliability":
+            # merge_all_data.py reads the state file under its 2024 name
+            shutil.copy(os.path.join(workdir, "reliability_by_state.csv"),
+                        os.path.join(workdir, "reliability_by_state_2024.csv"))
+
+        records = count_lines(os.path.join(workdir, records_file))
+        results.append({
+            "scale": scale,
+            "stage": stage,
+            "records": records,
+            "wall_seconds": round(wall, 4),
+            "records_per_sec": round(records / wall, 1) if wall > 0 else None,
+            "peak_rss_mb": round(rss, 1),
+        })
+        print(f"  {scale:>4}x {stage:<20} {records:>12,} {wall:>10.2f}s {records / wall:>14,.0f}/s {rss:>10.1f} MB")
+
+    return params, results
+
+def compare(results, baseline_path):
+    """Print wall-time ratios against a baseline run; return the regressed (scale, stage) pairs."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r["scale"], r["stage"]): r for r in json.load(f)["results"]}
+
+    print(f"\n=== COMPARISON WITH {baseline_path} ===")
+    print(f"{'SCALE':>5} {'STAGE':<20} {'BASE':>10} {'NOW':>10} {'RATIO':>7}")
+    print("-" * 56)
+
+    regressions = []
+    for r in results:
+        base = baseline.get((r["scale"], r["stage"]))
+        if base is None:
+            continue
+        ratio = r["wall_seconds"] / base["wall_seconds"] if base["wall_seconds"] else float("inf")
+        flag = "  <-- slower" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{r['scale']:>4}x {r['stage']:<20} {base['wall_seconds']:>9.2f}s {r['wall_seconds']:>9.2f}s {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append((r["scale"], r["stage"]))
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each eia_extraction stage on synthetic inputs.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="Scale factors to run")
+    parser.add_argument("--output", default=RESULTS_FILE, help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    print("=== BENCHMARKING PIPELINE ===\n")
+    print(f"  {'SCALE':>5} {'STAGE':<20} {'RECORDS':>12} {'WALL':>11} {'THROUGHPUT':>16} {'PEAK RSS':>13}")
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "inputs": [],
+        "results": [],
+    }
+
+    for scale in args.scales:
+        params, results = run_scale(scale)
+        report["inputs"].append(params)
+        report["results"].extend(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved: {args.output}")
+
+    if args.baseline:
+        regressions = compare(report["results"], args.baseline)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed beyond {REGRESSION_THRESHOLD:.2f}x")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
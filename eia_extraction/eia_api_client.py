@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+import aiohttp
+
+import instrumentation as metrics
+
+# === CONFIGURATION ===
+API_URL = os.environ.get("EIA_API_URL", "https://api.eia.gov")
+API_KEY = os.environ.get("EIA_API_KEY", "")
+CACHE_DIR = ".eia_cache"
+CACHE_MAX_AGE = int(os.environ.get("EIA_CACHE_MAX_AGE", 24 * 3600))  # Seconds; older responses are refetched
+
+CONCURRENCY = 8       # Max in-flight requests (and pooled connections)
+PAGE_SIZE = 5000      # API v2 maximum rows per request
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 60
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def format_period(period):
+    """Convert API v2 periods to bulk-file dates: 2025-01 -> 202501, 2024-01-01T08 -> 20240101T08Z"""
+    compact = period.replace("-", "")
+    if "T" in compact and not compact.endswith("Z"):
+        compact += "Z"
+    return compact
+
+def value_field(row):
+    """
+    API v2 rows name the value column after the measure (e.g. 'price' with
+    a companion 'price-units'). Fall back to a plain 'value' column.
+    """
+    for key in row:
+        if f"{key}-units" in row:
+            return key
+    return "value"
+
+def to_number(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def rows_to_record(series_id, rows, geography=""):
+    """
+    Build a record shaped like one line of the bulk file (data newest first).
+    The seriesid route does not return the bulk file's geography, so callers
+    pass it in (e.g. from their series index).
+    """
+    data = []
+    name = ""
+    units = ""
+
+    for row in rows:
+        key = value_field(row)
+        data.append([format_period(str(row["period"])), to_number(row.get(key))])
+        name = name or row.get("seriesDescription") or row.get("series-description") or ""
+        units = units or row.get(f"{key}-units") or row.get("units") or ""
+
+    data.sort(key=lambda point: point[0], reverse=True)
+
+    return {
+        "series_id": series_id,
+        "name": name,
+        "units": units,
+        "geography": geography,
+        "f": series_id.rsplit(".", 1)[-1],
+        "start": data[-1][0] if data else "",
+        "end": data[0][0] if data else "",
+        "data": data,
+    }
+
+class EIAClient:
+    """
+    Async client for the EIA API v2 series-id route. One pooled session is
+    shared by all requests; a semaphore bounds how many are in flight.
+    """
+    def __init__(self, api_url=API_URL, api_key=API_KEY, concurrency=CONCURRENCY,
+                 page_size=PAGE_SIZE, max_retries=MAX_RETRIES, cache_dir=CACHE_DIR,
+                 cache_max_age=CACHE_MAX_AGE, refresh=False):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.cache_dir = cache_dir
+        self.cache_max_age = cache_max_age
+        self.refresh = refresh  # Skip cached responses (but still update the cache)
+        self.session = None
+        self.semaphore = None
+        self.requests_made = 0
+        self.cache_hits = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _cache_path(self, url, params):
+        # The API key is left out so cached responses survive key rotation
+        key = json.dumps([url, sorted(params.items())])
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _read_cache(self, cache_path):
+        """Cached payload, or None if missing, expired or refresh was requested."""
+        if self.refresh:
+            return None
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self.cache_max_age:
+                return None
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self, cache_path, payload):
+        # Write to a temp file and rename so readers never see a partial response
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def _get_json(self, url, params):
+        cache_path = self._cache_path(url, params) if self.cache_dir else None
+        if cache_path:
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+        query = dict(params, api_key=self.api_key) if self.api_key else params
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    self.requests_made += 1
+                    async with self.session.get(url, params=query) as resp:
+                        if resp.status == 404:
+                            return None
+                        if resp.status not in RETRY_STATUSES:
+                            resp.raise_for_status()
+                            payload = await resp.json()
+                            break
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+
+            if attempt == self.max_retries:
+                raise RuntimeError(f"Giving up on {url} after {self.max_retries + 1} attempts")
+
+            # Exponential backoff with jitter
+            await asyncio.sleep(BACKOFF_SECONDS * 2 ** attempt * (0.5 + random.random()))
+
+        if cache_path:
+            self._write_cache(cache_path, payload)
+        return payload
+
+    async def fetch_series(self, series_id, geography=""):
+        """Fetch every page of one series and return it as a bulk-file record (or None)."""
+        url = f"{self.api_url}/v2/seriesid/{series_id}"
+
+        first = await self._get_json(url, {"offset": 0, "length": self.page_size})
+        if first is None:
+            return None
+
+        response = first.get("response", {})
+        rows = list(response.get("data", []))
+        total = int(response.get("total", len(rows)))
+
+        # Remaining pages are independent, so request them concurrently
+        offsets = range(self.page_size, total, self.page_size)
+        pages = await asyncio.gather(*[
+            self._get_json(url, {"offset": offset, "length": self.page_size})
+            for offset in offsets
+        ])
+        for page in pages:
+            if page is not None:
+                rows.extend(page.get("response", {}).get("data", []))
+
+        if not rows:
+            return None
+        return rows_to_record(series_id, rows, geography)
+
+    async def fetch_many(self, series_ids, geographies=None):
+        """
+        Records in input order. A series that still fails after its retries
+        comes back as the exception instead of aborting the whole batch.
+        """
+        geographies = geographies or {}
+        return await asyncio.gather(*[
+            self.fetch_series(sid, geographies.get(sid, "")) for sid in series_ids
+        ], return_exceptions=True)
+
+def fetch_series(series_ids, geographies=None, **client_options):
+    """
+    Fetch the given series ids and return records in the same shape as
+    bulk-file lines, in input order. Series the API does not know, or that
+    still fail after retries, are reported and skipped.
+    geographies optionally maps series_id -> bulk-file geography.
+    """
+    series_ids = list(series_ids)
+
+    async def run():
+        async with EIAClient(**client_options) as client:
+            records = await client.fetch_many(series_ids, geographies)
+            print(f"  API requests: {client.requests_made:,}, cache hits: {client.cache_hits:,}")
+            metrics.count("api_requests", client.requests_made)
+            metrics.count("api_cache_hits", client.cache_hits)
+            return records
+
+    print(f"Fetching {len(series_ids):,} series from {client_options.get('api_url', API_URL)}...")
+    records = asyncio.run(run())
+
+    failed = [(sid, r) for sid, r in zip(series_ids, records) if isinstance(r, BaseException)]
+    found = [r for r in records if r is not None and not isinstance(r, BaseException)]
+    metrics.count("series_matched", len(found))
+    metrics.count("api_failures", len(failed))
+
+    print(f"\nDone! Fetched {len(found):,} of {len(series_ids):,} series.")
+    if failed:
+        print(f"  Failed after retries ({len(failed):,}):")
+        for sid, error in failed[:10]:
+            print(f"    {sid}: {type(error).__name__}: {error}")
+        if len(failed) > 10:
+            print(f"    ... and {len(failed) - 10:,} more")
+    return found
@@ -0,0 +1,108 @@
+import csv
+import math
+import random
+import zlib
+
+from aiohttp import web
+
+from extract_seds_burden import BURDEN_PATTERNS, load_states
+
+# === CONFIGURATION ===
+SERIES_INDEX = "energy_access_data.csv"   # ELEC series index from extract_access_series.py
+STATES_FILE = "state_median_income_2024.csv"
+HOST = "127.0.0.1"
+PORT = 8089
+FAIL_RATE = 0.0  # Fraction of requests answered with 503, to exercise client retries
+
+# SEDS.<BURDEN_PATTERNS>.<state>.A is served alongside the ELEC index
+SEDS_YEARS = (1970, 2023)
+
+MAX_PAGE = 5000
+
+def periods_for(freq, start, end):
+    """API v2 period labels between bulk-file start/end dates (202501, 2025Q1, 2025)."""
+    if freq == "M":
+        first, last = int(start[:4]) * 12 + int(start[4:6]) - 1, int(end[:4]) * 12 + int(end[4:6]) - 1
+        return [f"{i // 12}-{i % 12 + 1:02d}" for i in range(first, last + 1)]
+    if freq == "Q":
+        first, last = int(start[:4]) * 4 + int(start[5]) - 1, int(end[:4]) * 4 + int(end[5]) - 1
+        return [f"{i // 4}-Q{i % 4 + 1}" for i in range(first, last + 1)]
+    return [str(y) for y in range(int(start[:4]), int(end[:4]) + 1)]
+
+def synthetic_value(series_id, index):
+    """Deterministic, seasonally varying value so repeated runs agree."""
+    seed = zlib.crc32(series_id.encode())
+    base = 50 + seed % 5000
+    return round(base * (1 + 0.2 * math.sin(index * math.pi / 6)) + (seed >> 8) % 17, 2)
+
+def load_catalog():
+    """series_id -> (name, units, freq, start, end)"""
+    catalog = {}
+
+    with open(SERIES_INDEX, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            catalog[row["series_id"]] = (
+                row["name"], row["units"], row["frequency"], row["start"], row["end"]
+            )
+
+    start, end = SEDS_YEARS
+    for metric in BURDEN_PATTERNS:
+        for state in load_states(STATES_FILE):
+            sid = f"SEDS.{metric}.{state}.A"
+            catalog[sid] = (f"{metric} : {state}", "", "A", str(start), str(end))
+
+    return catalog
+
+def build_rows(series_id, entry):
+    name, units, freq, start, end = entry
+    rows = []
+    for i, period in enumerate(periods_for(freq, start, end)):
+        rows.append({
+            "period": period,
+            "seriesDescription": name,
+            "value": synthetic_value(series_id, i),
+            "units": units,
+        })
+    rows.reverse()  # API v2 returns newest first
+    return rows
+
+async def handle_series(request):
+    if FAIL_RATE and random.random() < FAIL_RATE:
+        raise web.HTTPServiceUnavailable()
+
+    series_id = request.match_info["series_id"]
+    entry = request.app["catalog"].get(series_id)
+    if entry is None:
+        raise web.HTTPNotFound(text=f"Series {series_id} not found")
+
+    cache = request.app["rows"]
+    if series_id not in cache:
+        cache[series_id] = build_rows(series_id, entry)
+    rows = cache[series_id]
+
+    offset = int(request.query.get("offset", 0))
+    length = min(int(request.query.get("length", MAX_PAGE)), MAX_PAGE)
+
+    return web.json_response({
+        "response": {
+            "total": len(rows),
+            "data": rows[offset:offset + length],
+        },
+        "request": {"command": f"/v2/seriesid/{series_id}"},
+    })
+
+def create_app():
+    app = web.Application()
+    app["catalog"] = load_catalog()
+    app["rows"] = {}
+    app.router.add_get("/v2/seriesid/{series_id}", handle_series)
+    return app
+
+def main():
+    app = create_app()
+    print(f"Serving {len(app['catalog']):,} mock series on http://{HOST}:{PORT}")
+    print(f"Point the client at it with: EIA_API_URL=http://{HOST}:{PORT}\n")
+    web.run_app(app, host=HOST, port=PORT, print=None)
+
+if __name__ == "__main__":
+    main()
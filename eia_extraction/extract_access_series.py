@@ -2,11 +2,21 @@ import json
 import csv
 import os
 
+import instrumentation as metrics
+
 # === CONFIGURATION ===
 INPUT_FILE = "elec.txt"  # Path to your bulk file
 OUTPUT_CSV = "energy_access_data.csv"
 OUTPUT_JSON = "energy_access_series.json"
 
+# "bulk" scans INPUT_FILE; "api" fetches only the series listed in SERIES_INDEX
+# from an EIA API v2 endpoint (see eia_api_client.py). The index is only read
+# in api mode: its CSV goes to OUTPUT_CSV_API so failed series are not dropped
+# from the index for the next refresh.
+SOURCE = "bulk"
+SERIES_INDEX = "energy_access_data.csv"
+OUTPUT_CSV_API = "energy_access_data_api.csv"
+
 # Series patterns for Energy Access indicators
 ACCESS_PATTERNS = [
     "ELEC.SALES.",        # All sales (includes RES, COM, IND, ALL)
@@ -20,40 +30,71 @@ ACCESS_PATTERNS = [
 def matches_pattern(series_id):
     return any(pattern in series_id for pattern in ACCESS_PATTERNS)
 
-def main():
-    matched_series = []
+def scan_series(input_file, matches, progress_every=100000):
+    """
+    Stream a bulk file line by line and yield each record whose
+    series_id passes matches(series_id). Only one record is decoded at a time.
+    """
     total_lines = 0
     matched_count = 0
+    decode_failures = 0
 
-    print(f"Reading {INPUT_FILE}...")
-    print(f"Looking for patterns: {ACCESS_PATTERNS}\n")
-
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+    with open(input_file, 'r', encoding='utf-8') as f:
         for line in f:
             total_lines += 1
-            if total_lines % 100000 == 0:
+            if total_lines % progress_every == 0:
                 print(f"  Processed {total_lines:,} lines, found {matched_count:,} matches...")
 
             try:
                 record = json.loads(line.strip())
-                series_id = record.get("series_id", "")
-                
-                if matches_pattern(series_id):
-                    matched_count += 1
-                    matched_series.append(record)
             except json.JSONDecodeError:
+                decode_failures += 1
                 continue
 
+            if matches(record.get("series_id", "")):
+                matched_count += 1
+                yield record
+
     print(f"\nDone! Found {matched_count:,} series out of {total_lines:,} total.")
 
+    # Counted once per scan so the per-line loop stays untouched
+    metrics.count("lines_scanned", total_lines)
+    metrics.count("json_decode_failures", decode_failures)
+    metrics.count("series_matched", matched_count)
+
+def load_series(stream=False):
+    """
+    Matched series from the configured SOURCE. With stream=True a bulk scan
+    comes back as a generator so callers can fold series one at a time.
+    """
+    if SOURCE == "api":
+        # Imported here so bulk mode does not need aiohttp
+        from eia_api_client import fetch_series
+
+        with open(SERIES_INDEX, 'r', encoding='utf-8') as f:
+            geographies = {
+                row["series_id"]: row["geography"]
+                for row in csv.DictReader(f) if matches_pattern(row["series_id"])
+            }
+        with metrics.span("fetch_api"):
+            return fetch_series(list(geographies), geographies)
+
+    print(f"Reading {INPUT_FILE}...")
+    if stream:
+        return scan_series(INPUT_FILE, matches_pattern)
+    with metrics.span("scan"):
+        return list(scan_series(INPUT_FILE, matches_pattern))
+
+def write_outputs(matched_series):
     # === Save as JSON ===
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
+    with metrics.span("write_json"), open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
         json.dump(matched_series, f, indent=2)
     print(f"Saved JSON: {OUTPUT_JSON}")
 
     # === Save as CSV (flattened) ===
+    output_csv = OUTPUT_CSV_API if SOURCE == "api" else OUTPUT_CSV
     if matched_series:
-        with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
+        with metrics.span("write_csv"), open(output_csv, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(["series_id", "name", "units", "geography", "frequency", "start", "end", "data_points"])
             
@@ -68,7 +109,15 @@ def main():
                     s.get("end", ""),
                     len(s.get("data", []))
                 ])
-        print(f"Saved CSV index: {OUTPUT_CSV}")
+        metrics.count("rows_written", len(matched_series))
+        print(f"Saved CSV index: {output_csv}")
+
+@metrics.instrument("extract")
+def main():
+    print(f"Looking for patterns: {ACCESS_PATTERNS}\n")
+
+    matched_series = load_series()
+    write_outputs(matched_series)
 
     # === Summary by type ===
     print("\n=== SUMMARY BY TYPE ===")
@@ -0,0 +1,308 @@
+import calendar
+import csv
+import math
+from collections import defaultdict
+
+import instrumentation as metrics
+from extract_access_series import scan_series
+
+# === CONFIGURATION ===
+INPUT_FILE = "EBA.txt"  # EIA-930 hourly bulk file
+BA_STATE_FILE = "ba_state_map.csv"
+OUTPUT_DAILY = "eba_daily.csv"
+OUTPUT_MONTHLY = "eba_monthly.csv"
+OUTPUT_STATE = "eba_state_annual.csv"
+
+# Hourly balancing-authority totals in each BA's local time, e.g. 'EBA.CISO-ALL.D.HL'.
+# The '.H' twins are UTC and would shift every day, month and year boundary
+# by the BA's offset, so they are skipped.
+HOURLY_FREQ = "HL"
+
+EBA_METRICS = {
+    "D": "demand",            # Demand (MWh per hour)
+    "NG": "net_generation",   # Net generation (MWh per hour)
+}
+
+QUANTILES = [0.50, 0.95, 0.99]
+SKETCH_ACCURACY = 0.01  # Relative error of the percentile sketch
+
+def parse_series_id(series_id):
+    """
+    Parse series_id like 'EBA.CISO-ALL.D.HL'
+    Returns: (ba, metric) or (None, None) for anything but hourly BA totals
+    """
+    parts = series_id.split(".")
+    if len(parts) != 4 or parts[0] != "EBA" or parts[3] != HOURLY_FREQ:
+        return None, None
+
+    ba_scope, metric = parts[1], parts[2]
+    if not ba_scope.endswith("-ALL") or metric not in EBA_METRICS:
+        return None, None
+
+    return ba_scope[:-4], EBA_METRICS[metric]
+
+def matches_pattern(series_id):
+    return parse_series_id(series_id)[0] is not None
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style). Every value lands in a
+    bucket whose width is proportional to its magnitude, so quantiles come
+    back within SKETCH_ACCURACY relative error from a few hundred counters.
+    """
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = defaultdict(int)
+        self.negative = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value):
+        self.count += 1
+        if value > 0:
+            self.positive[self._key(value)] += 1
+        elif value < 0:
+            self.negative[self._key(-value)] += 1
+        else:
+            self.zeros += 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # Most negative values first, then zeros, then positives
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+
+        return self._value(max(self.positive))
+
+class RunningStats:
+    """Online sum / peak / min / count for one period, optionally with a sketch."""
+    __slots__ = ("total", "peak", "low", "hours", "sketch")
+
+    def __init__(self, with_sketch=False):
+        self.total = 0.0
+        self.peak = None
+        self.low = None
+        self.hours = 0
+        self.sketch = QuantileSketch() if with_sketch else None
+
+    def add(self, value):
+        self.total += value
+        self.hours += 1
+        if self.peak is None or value > self.peak:
+            self.peak = value
+        if self.low is None or value < self.low:
+            self.low = value
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+def aggregate_series(data):
+    """
+    Fold hourly [timestamp, value] pairs into daily and monthly RunningStats.
+    Local-time timestamps look like '20240101T00-08'; only the date part is
+    used, so days and months follow the BA's own clock (including DST).
+    """
+    daily = defaultdict(RunningStats)
+    monthly = {}
+
+    for timestamp, value in data:
+        if value == "- -" or value is None:
+            continue
+
+        day = timestamp[:8]
+        month_key = (day[:4], day[4:6])
+
+        daily[day].add(value)
+        if month_key not in monthly:
+            monthly[month_key] = RunningStats(with_sketch=True)
+        monthly[month_key].add(value)
+
+    return daily, monthly
+
+def load_ba_state_map(path):
+    """
+    Load ba -> [(state, share)]. Multi-state BAs can be listed once per state
+    with fractional shares that sum to 1.
+    """
+    ba_map = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            ba_map[row["ba"]].append((row["state"], float(row.get("share") or 1.0)))
+    return ba_map
+
+def load_complete_states(path):
+    """
+    States whose whole load is served by BAs in the map: every row for the
+    state must have state_complete = 1. Coverage is only reported for these.
+    """
+    flags = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            flags[row["state"]].append((row.get("state_complete") or "0").strip() == "1")
+    return {state for state, complete in flags.items() if all(complete)}
+
+def hours_in_year(year):
+    return 8784 if calendar.isleap(int(year)) else 8760
+
+def fmt(value, digits=1):
+    return "" if value is None else f"{value:.{digits}f}"
+
+@metrics.instrument("extract_eba")
+def main():
+    print(f"Reading {INPUT_FILE}...")
+    print(f"Looking for hourly BA series (.{HOURLY_FREQ}, local time): {sorted(EBA_METRICS)}\n")
+
+    ba_map = load_ba_state_map(BA_STATE_FILE)
+    complete_states = load_complete_states(BA_STATE_FILE)
+    print(f"Loaded BA -> state mapping for {len(ba_map)} balancing authorities "
+          f"({len(complete_states)} states fully mapped)\n")
+
+    # (state, year, metric) -> allocated annual totals; (state, year) -> BAs seen
+    state_totals = defaultdict(float)
+    state_peaks = defaultdict(float)
+    state_hours = defaultdict(int)
+    state_share_hours = defaultdict(float)
+    state_bas = defaultdict(set)
+
+    # Share-weighted BA count every state would have with all its mapped BAs present
+    expected_share = defaultdict(float)
+    for entries in ba_map.values():
+        for state, share in entries:
+            expected_share[state] += share
+
+    unmapped = set()
+    series_count = 0
+    daily_rows = 0
+    monthly_rows = 0
+
+    with open(OUTPUT_DAILY, 'w', newline='', encoding='utf-8') as daily_f, \
+         open(OUTPUT_MONTHLY, 'w', newline='', encoding='utf-8') as monthly_f:
+        daily_writer = csv.writer(daily_f)
+        monthly_writer = csv.writer(monthly_f)
+
+        daily_writer.writerow(["ba", "metric", "date", "total_mwh", "peak_mw", "min_mw", "hours"])
+        monthly_writer.writerow(
+            ["ba", "metric", "year", "month", "total_mwh", "peak_mw", "min_mw"]
+            + [f"p{int(q * 100)}_mw" for q in QUANTILES]
+            + ["hours"]
+        )
+
+        # Each series is aggregated and written out before the next one is decoded
+        for series in scan_series(INPUT_FILE, matches_pattern):
+            ba, metric = parse_series_id(series.get("series_id", ""))
+            daily, monthly = aggregate_series(series.get("data", []))
+            series_count += 1
+
+            daily_rows += len(daily)
+            monthly_rows += len(monthly)
+
+            for day in sorted(daily):
+                s = daily[day]
+                daily_writer.writerow([
+                    ba, metric, f"{day[:4]}-{day[4:6]}-{day[6:]}",
+                    fmt(s.total), fmt(s.peak), fmt(s.low), s.hours
+                ])
+
+            annual_total = defaultdict(float)
+            annual_peak = {}
+            annual_hours = defaultdict(int)
+            for (year, month) in sorted(monthly):
+                s = monthly[(year, month)]
+                # Bucket midpoints can fall just outside the observed range
+                quantiles = [min(max(s.sketch.quantile(q), s.low), s.peak) for q in QUANTILES]
+                monthly_writer.writerow(
+                    [ba, metric, year, month, fmt(s.total), fmt(s.peak), fmt(s.low)]
+                    + [fmt(v) for v in quantiles]
+                    + [s.hours]
+                )
+                annual_total[year] += s.total
+                annual_peak[year] = max(annual_peak.get(year, s.peak), s.peak)
+                annual_hours[year] += s.hours
+
+            if ba not in ba_map:
+                unmapped.add(ba)
+                continue
+
+            for state, share in ba_map[ba]:
+                for year, total in annual_total.items():
+                    state_totals[(state, year, metric)] += share * total
+                    state_peaks[(state, year, metric)] += share * annual_peak[year]
+                    state_hours[(state, year, metric)] += annual_hours[year]
+                    state_share_hours[(state, year, metric)] += share * annual_hours[year]
+                    state_bas[(state, year)].add(ba)
+
+    metrics.count("rows_written", daily_rows + monthly_rows)
+    print(f"Saved daily: {OUTPUT_DAILY}")
+    print(f"Saved monthly: {OUTPUT_MONTHLY}")
+
+    # === STATE-LEVEL ANNUAL PANEL (merges on state, year) ===
+    # Peaks are summed across BAs, i.e. non-coincident state peak.
+    # Coverage = share-weighted hours found / hours every mapped BA would report
+    # for the full year, so partial years and missing BAs show up as < 1. BAs
+    # absent from BA_STATE_FILE are invisible here, so coverage is left blank
+    # (and merge_all_data.py blanks the totals) unless the map marks the state
+    # complete.
+    def coverage(state, year, metric):
+        if state not in complete_states:
+            return ""
+        possible = expected_share[state] * hours_in_year(year)
+        return fmt(state_share_hours.get((state, year, metric), 0) / possible, 4)
+
+    with open(OUTPUT_STATE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "state", "year",
+            "eba_demand_mwh", "eba_peak_demand_mw",
+            "eba_net_generation_mwh", "eba_ba_count",
+            "eba_demand_hours", "eba_net_generation_hours",
+            "eba_demand_coverage", "eba_net_generation_coverage"
+        ])
+
+        for state, year in sorted(state_bas):
+            writer.writerow([
+                state,
+                year,
+                fmt(state_totals.get((state, year, "demand"))),
+                fmt(state_peaks.get((state, year, "demand"))),
+                fmt(state_totals.get((state, year, "net_generation"))),
+                len(state_bas[(state, year)]),
+                state_hours.get((state, year, "demand"), 0),
+                state_hours.get((state, year, "net_generation"), 0),
+                coverage(state, year, "demand"),
+                coverage(state, year, "net_generation")
+            ])
+
+    metrics.count("rows_written", len(state_bas))
+    print(f"Saved state-level: {OUTPUT_STATE}")
+
+    # === SUMMARY ===
+    print("\n=== SUMMARY ===")
+    print(f"  Hourly series aggregated: {series_count:,}")
+    print(f"  State-year rows: {len(state_bas):,}")
+    if unmapped:
+        print(f"  BAs without a state mapping ({len(unmapped)}): {', '.join(sorted(unmapped))}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,17 @@
 import pandas as pd
 import numpy as np
 
+import instrumentation as metrics
+
 # === CONFIGURATION ===
 INPUT_FILE = "Reliability_2024.xlsx"  # Rename your file to this, or change path
 OUTPUT_UTILITY = "reliability_by_utility.csv"
 OUTPUT_STATE = "reliability_by_state.csv"
 
-def main():
-    print(f"Reading {INPUT_FILE}...")
-    
+def load_utilities(input_file):
+    """Read the EIA-861 reliability workbook into one row per utility."""
     # Read with header at row 1
-    df = pd.read_excel(INPUT_FILE, header=1)
+    df = pd.read_excel(input_file, header=1)
     
     # Skip the first row (which contains column descriptions)
     df = df.iloc[1:]
@@ -49,27 +50,26 @@ def main():
     df['standard'] = np.where(df['ieee_saidi_with_med'].notna(), 'IEEE', 
                               np.where(df['other_saidi_with_med'].notna(), 'Other', 'None'))
     
-    # === SAVE UTILITY-LEVEL DATA ===
-    utility_df = df[['data_year', 'utility_number', 'utility_name', 'state', 'ownership',
-                     'saidi_with_med', 'saifi_with_med', 'caidi_with_med',
-                     'saidi_wo_med', 'saifi_wo_med', 'caidi_wo_med',
-                     'customers', 'standard']].copy()
-    
-    utility_df.to_csv(OUTPUT_UTILITY, index=False)
-    print(f"Saved utility-level: {OUTPUT_UTILITY}")
-    print(f"  Utilities: {len(utility_df)}")
-    
-    # === AGGREGATE TO STATE LEVEL (weighted by customers) ===
+    return df[['data_year', 'utility_number', 'utility_name', 'state', 'ownership',
+               'saidi_with_med', 'saifi_with_med', 'caidi_with_med',
+               'saidi_wo_med', 'saifi_wo_med', 'caidi_wo_med',
+               'customers', 'standard']].copy()
+
+def weighted_avg(group, col, weight_col='customers'):
+    mask = group[col].notna() & group[weight_col].notna()
+    if mask.sum() == 0:
+        return np.nan
+    return np.average(group.loc[mask, col], weights=group.loc[mask, weight_col])
+
+def aggregate_by_state(utility_df):
+    """Customer-weighted state averages from utility-level rows (as in OUTPUT_UTILITY)."""
     # Filter to rows with valid data
-    valid = df[df['customers'].notna() & (df['customers'] > 0) & 
-               (df['saidi_with_med'].notna() | df['saidi_wo_med'].notna())].copy()
-    
-    # Calculate weighted averages by state
-    def weighted_avg(group, col, weight_col='customers'):
-        mask = group[col].notna() & group[weight_col].notna()
-        if mask.sum() == 0:
-            return np.nan
-        return np.average(group.loc[mask, col], weights=group.loc[mask, weight_col])
+    valid = utility_df[utility_df['customers'].notna() & (utility_df['customers'] > 0) & 
+                       (utility_df['saidi_with_med'].notna() | utility_df['saidi_wo_med'].notna())]
+    columns = ['state', 'year', 'saidi_with_med', 'saifi_with_med',
+               'saidi_wo_med', 'saifi_wo_med', 'total_customers', 'utility_count']
+    if valid.empty:
+        return pd.DataFrame(columns=columns)
     
     state_agg = valid.groupby('state').apply(
         lambda g: pd.Series({
@@ -83,10 +83,28 @@ def main():
     ).reset_index()
     
     state_agg['year'] = 2024
-    state_agg = state_agg[['state', 'year', 'saidi_with_med', 'saifi_with_med', 
-                           'saidi_wo_med', 'saifi_wo_med', 'total_customers', 'utility_count']]
+    return state_agg[columns]
+
+@metrics.instrument("extract_reliability")
+def main():
+    print(f"Reading {INPUT_FILE}...")
+    
+    with metrics.span("load_utilities"):
+        utility_df = load_utilities(INPUT_FILE)
+    
+    # === SAVE UTILITY-LEVEL DATA ===
+    with metrics.span("write_utility_csv"):
+        utility_df.to_csv(OUTPUT_UTILITY, index=False)
+    metrics.count("rows_written", len(utility_df))
+    print(f"Saved utility-level: {OUTPUT_UTILITY}")
+    print(f"  Utilities: {len(utility_df)}")
+    
+    # === AGGREGATE TO STATE LEVEL (weighted by customers) ===
+    with metrics.span("aggregate_states"):
+        state_agg = aggregate_by_state(utility_df)
     
     state_agg.to_csv(OUTPUT_STATE, index=False)
+    metrics.count("rows_written", len(state_agg))
     print(f"\nSaved state-level: {OUTPUT_STATE}")
     print(f"  States: {len(state_agg)}")
     
@@ -1,11 +1,19 @@
-import json
 import csv
 from collections import defaultdict
 
+import instrumentation as metrics
+import panel_io
+from extract_access_series import scan_series
+
 # === CONFIGURATION ===
 INPUT_FILE = "SEDS.txt"
 OUTPUT_CSV = "seds_expenditure.csv"
 
+# "bulk" scans INPUT_FILE; "api" fetches SEDS.<pattern>.<state>.A for every
+# state in STATES_FILE from an EIA API v2 endpoint (see eia_api_client.py)
+SOURCE = "bulk"
+STATES_FILE = "state_median_income_2024.csv"
+
 # Series patterns for energy burden
 BURDEN_PATTERNS = [
     "TEEAP",   # Total energy expenditures per capita ($)
@@ -32,33 +40,37 @@ def parse_series_id(series_id):
     
     return metric, state, freq
 
-def main():
-    matched_series = []
-    total_lines = 0
-    matched_count = 0
+def load_states(path=None):
+    """States in STATES_FILE plus the US total, i.e. every geography requested in api mode."""
+    with open(path or STATES_FILE, 'r', encoding='utf-8') as f:
+        return [row["state"] for row in csv.DictReader(f)] + ["US"]
 
-    print(f"Reading {INPUT_FILE}...")
-    print(f"Looking for patterns: {BURDEN_PATTERNS}\n")
+def load_series(stream=False):
+    """Matched series from the configured SOURCE (a generator for streamed bulk scans)."""
+    if SOURCE == "api":
+        # Imported here so bulk mode does not need aiohttp
+        from eia_api_client import fetch_series
 
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            total_lines += 1
-            if total_lines % 10000 == 0:
-                print(f"  Processed {total_lines:,} lines, found {matched_count:,} matches...")
-
-            try:
-                record = json.loads(line.strip())
-                series_id = record.get("series_id", "")
-                
-                if matches_pattern(series_id):
-                    matched_count += 1
-                    matched_series.append(record)
-            except json.JSONDecodeError:
-                continue
+        series_ids = [f"SEDS.{p}.{state}.A" for p in BURDEN_PATTERNS for state in load_states()]
+        with metrics.span("fetch_api"):
+            return fetch_series(series_ids)
 
-    print(f"\nDone! Found {matched_count:,} series out of {total_lines:,} total.")
+    print(f"Reading {INPUT_FILE}...")
+    if stream:
+        return scan_series(INPUT_FILE, matches_pattern, progress_every=10000)
+    with metrics.span("scan"):
+        return list(scan_series(INPUT_FILE, matches_pattern, progress_every=10000))
+
+SEDS_COLUMNS = [
+    "state", "year",
+    "total_energy_expend_per_capita",    # TEEAP
+    "elec_resid_expend_per_capita",      # ESRCP
+    "elec_resid_expend_billion",         # ESRCB
+    "total_energy_expend_billion"        # TERCB
+]
 
-    # Flatten to panel format
+def build_panel(matched_series):
+    """Flatten to panel format: (state, year) -> {metric: value}"""
     panel_data = defaultdict(dict)
     
     for series in matched_series:
@@ -69,7 +81,6 @@ def main():
             continue
         
         data = series.get("data", [])
-        units = series.get("units", "")
         
         for date_str, value in data:
             if value == "- -" or value is None:
@@ -77,31 +88,39 @@ def main():
             
             key = (state, date_str)
             panel_data[key][metric.lower()] = value
+    
+    return panel_data
 
-    # Write to CSV
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "state", "year",
-            "total_energy_expend_per_capita",    # TEEAP
-            "elec_resid_expend_per_capita",      # ESRCP
-            "elec_resid_expend_billion",         # ESRCB
-            "total_energy_expend_billion"        # TERCB
-        ])
+def panel_rows(panel_data):
+    """Yield rows in SEDS_COLUMNS order, sorted by state, year."""
+    for key in sorted(panel_data.keys()):
+        state, year = key
+        v = panel_data[key]
         
-        for key in sorted(panel_data.keys()):
-            state, year = key
-            v = panel_data[key]
-            
-            writer.writerow([
-                state,
-                year,
-                v.get("teeap", ""),
-                v.get("esrcp", ""),
-                v.get("esrcb", ""),
-                v.get("tercb", "")
-            ])
-    
+        yield [
+            state,
+            year,
+            v.get("teeap", ""),
+            v.get("esrcp", ""),
+            v.get("esrcb", ""),
+            v.get("tercb", "")
+        ]
+
+def write_panel(panel_data, path):
+    panel_io.write_panel(panel_data, path, SEDS_COLUMNS, panel_rows)
+
+def panel_frame(panel_data):
+    return panel_io.panel_frame(panel_data, SEDS_COLUMNS, SEDS_COLUMNS[2:], panel_rows)
+
+@metrics.instrument("extract_seds")
+def main():
+    print(f"Looking for patterns: {BURDEN_PATTERNS}\n")
+
+    matched_series = load_series()
+    panel_data = build_panel(matched_series)
+
+    # Write to CSV
+    write_panel(panel_data, OUTPUT_CSV)
     print(f"Saved: {OUTPUT_CSV}")
 
     # Summary
@@ -1,8 +1,10 @@
 import json
-import csv
 import re
 from collections import defaultdict
 
+import instrumentation as metrics
+import panel_io
+
 # === CONFIGURATION ===
 INPUT_JSON = "energy_access_series.json"
 OUTPUT_CSV = "energy_access_panel.csv"
@@ -35,15 +37,13 @@ def format_date(date_str):
         return f"{date_str[:4]}-{date_str[4:]}"
     return date_str
 
-def main():
-    print(f"Reading {INPUT_JSON}...")
-    
-    with open(INPUT_JSON, 'r', encoding='utf-8') as f:
-        series_list = json.load(f)
-    
-    print(f"Loaded {len(series_list)} series")
-    
-    # Organize data by (geography, sector, date) -> {metric: value}
+PANEL_COLUMNS = [
+    "geography", "sector", "date", "year", "month",
+    "sales_million_kwh", "price_cents_kwh", "customers"
+]
+
+def build_panel(series_list):
+    """Organize data by (geography, sector, date) -> {metric: value}"""
     panel_data = defaultdict(dict)
     
     for series in series_list:
@@ -67,36 +67,50 @@ def main():
             key = (geo, sector, date_str)
             panel_data[key][metric.lower()] = value
     
+    return panel_data
+
+def panel_rows(panel_data):
+    """Yield panel rows in PANEL_COLUMNS order, sorted by geography, sector, date."""
+    for key in sorted(panel_data.keys()):
+        geo, sector, date_str = key
+        values = panel_data[key]
+        
+        # Parse year/month
+        year = date_str[:4] if len(date_str) >= 4 else ""
+        month = date_str[4:] if len(date_str) >= 6 else ""
+        
+        yield [
+            geo,
+            sector,
+            format_date(date_str),
+            year,
+            month,
+            values.get("sales", ""),
+            values.get("price", ""),
+            values.get("customers", "")
+        ]
+
+def write_panel(panel_data, path):
+    panel_io.write_panel(panel_data, path, PANEL_COLUMNS, panel_rows)
+
+def panel_frame(panel_data):
+    return panel_io.panel_frame(panel_data, PANEL_COLUMNS, PANEL_COLUMNS[3:], panel_rows)
+
+@metrics.instrument("flatten")
+def main():
+    print(f"Reading {INPUT_JSON}...")
+    
+    with metrics.span("load_json"), open(INPUT_JSON, 'r', encoding='utf-8') as f:
+        series_list = json.load(f)
+    
+    print(f"Loaded {len(series_list)} series")
+    metrics.count("series_loaded", len(series_list))
+    
+    panel_data = build_panel(series_list)
     print(f"Created {len(panel_data)} unique geo-sector-date combinations")
     
     # Write to CSV
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "geography", "sector", "date", "year", "month",
-            "sales_million_kwh", "price_cents_kwh", "customers"
-        ])
-        
-        # Sort by geography, sector, date
-        for key in sorted(panel_data.keys()):
-            geo, sector, date_str = key
-            values = panel_data[key]
-            
-            # Parse year/month
-            year = date_str[:4] if len(date_str) >= 4 else ""
-            month = date_str[4:] if len(date_str) >= 6 else ""
-            
-            writer.writerow([
-                geo,
-                sector,
-                format_date(date_str),
-                year,
-                month,
-                values.get("sales", ""),
-                values.get("price", ""),
-                values.get("customers", "")
-            ])
-    
+    write_panel(panel_data, OUTPUT_CSV)
     print(f"Saved: {OUTPUT_CSV}")
     
     # === Summary ===
@@ -0,0 +1,241 @@
+import csv
+import json
+import os
+import random
+
+from extract_seds_burden import BURDEN_PATTERNS
+
+# === CONFIGURATION ===
+OUTPUT_DIR = "synthetic"
+SCALE = 1
+
+# Sizes at 1x scale; everything below is multiplied by the scale factor
+SERIES_COUNT = 4000        # Lines in elec.txt (matched + filler)
+SEDS_SERIES_COUNT = 3000   # Lines in SEDS.txt (matched + filler)
+UTILITY_COUNT = 1500       # Rows in the reliability workbook
+HISTORY_MONTHS = 299       # 2001-01 .. 2025-11, like the real ELEC file
+MATCH_RATIO = 0.75         # Share of elec.txt lines that extract_access_series keeps
+NULL_RATIO = 0.01          # Share of observations written as '- -'
+SEED = 42
+
+END_YEAR, END_MONTH = 2025, 11
+
+STATES = [
+    "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DC", "DE", "FL", "GA", "HI", "IA",
+    "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI", "MN", "MO", "MS",
+    "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV", "NY", "OH", "OK", "OR", "PA",
+    "RI", "SC", "SD", "TN", "TX", "UT", "VA", "VT", "WA", "WI", "WV", "WY",
+]
+SECTORS = ["RES", "COM", "IND", "TRA", "OTH", "ALL"]
+FREQUENCIES = ["M", "Q", "A"]
+
+# metric -> (name, units, typical magnitude)
+ELEC_METRICS = {
+    "SALES": ("Retail sales of electricity", "million kilowatthours", 3000.0),
+    "PRICE": ("Average retail price of electricity", "cents per kilowatthour", 12.0),
+    "CUSTOMERS": ("Number of customer accounts", "number of customers", 2_000_000.0),
+}
+FILLER_PREFIXES = ["ELEC.GEN.", "ELEC.CONS_TOT.", "ELEC.COST.", "ELEC.RECEIPTS.", "ELEC.PLANT.GEN."]
+
+SEDS_FILLER_METRICS = ["CLTCB", "NGTCB", "PATCB", "RETCB", "TETCB", "ESTCB", "NUETB", "HYTCB"]
+SEDS_YEARS = range(1970, 2024)
+
+RELIABILITY_COLUMNS = [
+    'data_year', 'utility_number', 'utility_name', 'state', 'ownership',
+    'ieee_saidi_with_med', 'ieee_saifi_with_med', 'ieee_caidi_with_med',
+    'ieee_saidi_wo_med', 'ieee_saifi_wo_med', 'ieee_caidi_wo_med',
+    'ieee_saidi_los_with_med', 'ieee_saifi_los_with_med', 'ieee_caidi_los_with_med',
+    'ieee_customers', 'ieee_voltage', 'ieee_auto',
+    'other_saidi_with_med', 'other_saifi_with_med', 'other_caidi_with_med',
+    'other_saidi_wo_med', 'other_saifi_wo_med', 'other_caidi_wo_med',
+    'other_customers', 'other_inactive', 'other_momentary',
+    'other_voltage', 'other_auto',
+]
+
+def geographies(count):
+    """Real state codes first, then synthetic sub-state codes (e.g. 'Z0001') once they run out."""
+    geos = list(STATES)
+    i = 1
+    while len(geos) < count:
+        geos.append(f"Z{i:04d}")
+        i += 1
+    return geos[:count]
+
+def periods(freq, history_months):
+    """Bulk-file dates, newest first."""
+    months = []
+    year, month = END_YEAR, END_MONTH
+    for _ in range(history_months):
+        months.append((year, month))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+
+    if freq == "M":
+        return [f"{y}{m:02d}" for y, m in months]
+    if freq == "Q":
+        return list(dict.fromkeys(f"{y}Q{(m - 1) // 3 + 1}" for y, m in months))
+    return list(dict.fromkeys(str(y) for y, _ in months))
+
+def series_data(rng, dates, magnitude):
+    level = magnitude * rng.uniform(0.3, 1.7)
+    data = []
+    for i, date in enumerate(dates):
+        if rng.random() < NULL_RATIO:
+            data.append([date, "- -"])
+        else:
+            seasonal = 1 + 0.15 * ((i % 12) - 6) / 6
+            data.append([date, round(level * seasonal * rng.uniform(0.95, 1.05), 3)])
+    return data
+
+def series_line(series_id, name, units, freq, data):
+    return json.dumps({
+        "series_id": series_id,
+        "name": name,
+        "units": units,
+        "f": freq,
+        "start": data[-1][0],
+        "end": data[0][0],
+        "data": data,
+    }) + "\n"
+
+def write_elec(path, rng, series_count, history_months, match_ratio):
+    matched_target = int(series_count * match_ratio)
+    per_geo = len(ELEC_METRICS) * len(SECTORS) * len(FREQUENCIES)
+    geos = geographies(-(-matched_target // per_geo))
+    dates = {f: periods(f, history_months) for f in FREQUENCIES}
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for geo in geos:
+            for metric, (name, units, magnitude) in ELEC_METRICS.items():
+                for sector in SECTORS:
+                    for freq in FREQUENCIES:
+                        if written >= matched_target:
+                            break
+                        sid = f"ELEC.{metric}.{geo}-{sector}.{freq}"
+                        data = series_data(rng, dates[freq], magnitude)
+                        f.write(series_line(sid, f"{name} : {geo} : {sector}", units, freq, data))
+                        written += 1
+
+        # Filler: series the extract step must skip, plus category records.
+        # With match_ratio=0 nothing was matched, so borrow a state for names.
+        filler_geos = geos or geographies(1)
+        for i in range(series_count - written):
+            if i % 50 == 0:
+                f.write(json.dumps({"category_id": i, "name": f"Category {i}", "childseries": []}) + "\n")
+                continue
+            prefix = FILLER_PREFIXES[i % len(FILLER_PREFIXES)]
+            sid = f"{prefix}{filler_geos[i % len(filler_geos)]}-{i}.M"
+            data = series_data(rng, dates["M"], 500.0)
+            f.write(series_line(sid, f"Filler series {i}", "units", "M", data))
+
+    return written
+
+def write_seds(path, rng, series_count):
+    geos = STATES + ["US"]
+    years = [str(y) for y in reversed(SEDS_YEARS)]
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for metric in BURDEN_PATTERNS:
+            for state in geos:
+                magnitude = 1500.0 if metric.endswith("P") else 10_000.0
+                data = series_data(rng, years, magnitude)
+                f.write(series_line(f"SEDS.{metric}.{state}.A", f"{metric} : {state}", "", "A", data))
+                written += 1
+
+        for i in range(max(series_count - written, 0)):
+            metric = SEDS_FILLER_METRICS[i % len(SEDS_FILLER_METRICS)]
+            state = geos[(i // len(SEDS_FILLER_METRICS)) % len(geos)]
+            data = series_data(rng, years, 1000.0)
+            f.write(series_line(f"SEDS.{metric}{i}.{state}.A", f"{metric} : {state}", "", "A", data))
+
+    return written
+
+def write_reliability(path, rng, utility_count):
+    """Workbook laid out like EIA-861 Reliability: title row, header row, description row, data."""
+    import pandas as pd
+
+    rows = [
+        ["Synthetic reliability data"] + [""] * (len(RELIABILITY_COLUMNS) - 1),
+        RELIABILITY_COLUMNS,
+        ["description"] * len(RELIABILITY_COLUMNS),
+    ]
+
+    for i in range(utility_count):
+        row = dict.fromkeys(RELIABILITY_COLUMNS, "")
+        row.update({
+            'data_year': 2024,
+            'utility_number': 10000 + i,
+            'utility_name': f"Utility {i}",
+            'state': STATES[i % len(STATES)],
+            'ownership': rng.choice(["Investor Owned", "Cooperative", "Municipal"]),
+        })
+        saidi, saifi = rng.uniform(50, 400), rng.uniform(0.5, 2.5)
+        customers = int(rng.lognormvariate(9, 1.5))
+        prefix = "ieee" if rng.random() < 0.7 else "other"
+        row.update({
+            f'{prefix}_saidi_with_med': round(saidi * 1.4, 2),
+            f'{prefix}_saifi_with_med': round(saifi * 1.2, 3),
+            f'{prefix}_caidi_with_med': round(saidi * 1.4 / (saifi * 1.2), 2),
+            f'{prefix}_saidi_wo_med': round(saidi, 2),
+            f'{prefix}_saifi_wo_med': round(saifi, 3),
+            f'{prefix}_caidi_wo_med': round(saidi / saifi, 2),
+            f'{prefix}_customers': customers,
+        })
+        rows.append([row[c] for c in RELIABILITY_COLUMNS])
+
+    pd.DataFrame(rows).to_excel(path, header=False, index=False)
+
+def write_income(path, rng):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["state", "median_income_2024", "source"])
+        for state in STATES:
+            writer.writerow([state, rng.randint(50_000, 110_000), "Synthetic"])
+
+def generate(output_dir=OUTPUT_DIR, scale=SCALE, series_count=SERIES_COUNT,
+             seds_series_count=SEDS_SERIES_COUNT, utility_count=UTILITY_COUNT,
+             history_months=HISTORY_MONTHS, match_ratio=MATCH_RATIO, seed=SEED):
+    """
+    Write elec.txt, SEDS.txt, Reliability_2024.xlsx and state_median_income_2024.csv
+    into output_dir. Returns a dict describing what was generated.
+    """
+    if not 0 <= match_ratio <= 1:
+        raise ValueError(f"match_ratio must be between 0 and 1, got {match_ratio}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+
+    elec_lines = int(series_count * scale)
+    seds_lines = int(seds_series_count * scale)
+    utilities = int(utility_count * scale)
+
+    elec_matched = write_elec(os.path.join(output_dir, "elec.txt"), rng, elec_lines, history_months, match_ratio)
+    seds_matched = write_seds(os.path.join(output_dir, "SEDS.txt"), rng, seds_lines)
+    write_reliability(os.path.join(output_dir, "Reliability_2024.xlsx"), rng, utilities)
+    write_income(os.path.join(output_dir, "state_median_income_2024.csv"), rng)
+
+    return {
+        "scale": scale,
+        "elec_lines": elec_lines,
+        "elec_matched": elec_matched,
+        "seds_lines": max(seds_lines, seds_matched),
+        "seds_matched": seds_matched,
+        "utilities": utilities,
+        "history_months": history_months,
+        "match_ratio": match_ratio,
+        "seed": seed,
+    }
+
+def main():
+    print(f"Generating synthetic EIA inputs at {SCALE}x scale into {OUTPUT_DIR}/...")
+    summary = generate()
+
+    print("\n=== SUMMARY ===")
+    for key, value in summary.items():
+        print(f"  {key:<16} {value:>10,}" if isinstance(value, int) else f"  {key:<16} {value:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+# === CONFIGURATION ===
+# Everything is off unless EIA_METRICS=1 (or enable() is called). When off,
+# stage()/span() return a shared no-op context and count() returns at once.
+ENABLED = os.environ.get("EIA_METRICS", "0") not in ("", "0")
+TRACEMALLOC = os.environ.get("EIA_METRICS_TRACEMALLOC", "0") not in ("", "0")
+PROFILE = os.environ.get("EIA_PROFILE", "0") not in ("", "0")
+
+REPORT_FILE = os.environ.get("EIA_METRICS_REPORT", "run_report.json")
+RUN_ID = os.environ.get("EIA_RUN_ID") or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+PROFILE_DIR = "profiles"
+PROFILE_TOP_N = 15
+RSS_SAMPLE_SECONDS = 0.05
+
+_NULL = nullcontext()
+
+def _current_rss():
+    """Resident set size in bytes, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _max_rss():
+    """Process-lifetime peak RSS in bytes."""
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+class RSSSampler(threading.Thread):
+    """Background thread that tracks the highest RSS seen since the last reset."""
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        super().__init__(daemon=True, name="rss-sampler")
+        self.interval = interval
+        self.peak = _current_rss() or 0
+
+    def sample(self):
+        rss = _current_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def run(self):
+        while True:
+            self.sample()
+            time.sleep(self.interval)
+
+class Stage:
+    """Timings, counters and memory peaks for one pipeline stage."""
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.counters = {}
+        self.spans = {}
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+        self.peak_traced_mb = None
+        self.profile = None
+        self.hot_paths = None
+
+    def as_dict(self):
+        return {k: v for k, v in vars(self).items() if v is not None}
+
+class Recorder:
+    def __init__(self):
+        self.enabled = False
+        self.stages = []
+        self.stack = []
+        self.run_counters = {}
+        self.sampler = None
+        self.profile = False
+        self.profiling = False
+        self.started = None
+
+    def enable(self, tracemalloc_on=TRACEMALLOC, profile=PROFILE):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.profile = profile
+        self.started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        if _current_rss() is not None:
+            self.sampler = RSSSampler()
+            self.sampler.start()
+        if tracemalloc_on and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        atexit.register(self.write_report)
+
+    # --- stages ---
+
+    def _enter(self, name):
+        stage = Stage(name)
+        frame = {
+            "stage": stage,
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+            "outer_rss": None,
+            "traced_floor": 0,
+            "profiler": None,
+        }
+
+        if self.sampler:
+            # Save the enclosing stage's running peak and restart from now
+            frame["outer_rss"] = self.sampler.peak
+            self.sampler.peak = _current_rss() or 0
+        if tracemalloc.is_tracing():
+            # Keep the enclosing stage's peak so far before restarting the peak counter
+            if self.stack:
+                parent = self.stack[-1]
+                parent["traced_floor"] = max(parent["traced_floor"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if self.profile and not self.profiling:
+            # Only the outermost stage is profiled; cProfile cannot nest
+            frame["profiler"] = cProfile.Profile()
+            self.profiling = True
+            frame["profiler"].enable()
+
+        self.stack.append(frame)
+
+    def _exit(self):
+        frame = self.stack.pop()
+        stage = frame["stage"]
+
+        profiler = frame["profiler"]
+        if profiler:
+            profiler.disable()
+            self.profiling = False
+            self._save_profile(stage, profiler)
+
+        stage.wall_seconds = round(time.perf_counter() - frame["wall"], 4)
+        stage.cpu_seconds = round(time.process_time() - frame["cpu"], 4)
+
+        if self.sampler:
+            self.sampler.sample()
+            stage_peak = self.sampler.peak
+            stage.peak_rss_mb = round(stage_peak / 2**20, 1)
+            self.sampler.peak = max(frame["outer_rss"], stage_peak)
+        else:
+            stage.peak_rss_mb = round(_max_rss() / 2**20, 1)
+
+        if tracemalloc.is_tracing():
+            stage_traced = max(tracemalloc.get_traced_memory()[1], frame["traced_floor"])
+            stage.peak_traced_mb = round(stage_traced / 2**20, 1)
+
+        self.stages.append(stage)
+
+    def _save_profile(self, stage, profiler):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{RUN_ID}_{stage.name}.prof")
+        profiler.dump_stats(path)
+        stage.profile = path
+
+        stats = pstats.Stats(profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        stage.hot_paths = [
+            {
+                "function": f"{func[0]}:{func[1]}({func[2]})",
+                "calls": calls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            }
+            for func, (_, calls, tottime, cumtime, _) in rows[:PROFILE_TOP_N]
+        ]
+
+    # --- counters and spans ---
+
+    def count(self, name, n=1):
+        target = self.stack[-1]["stage"].counters if self.stack else self.run_counters
+        target[name] = target.get(name, 0) + n
+
+    def add_span(self, name, seconds):
+        if not self.stack:
+            return
+        spans = self.stack[-1]["stage"].spans
+        entry = spans.setdefault(name, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] = round(entry["seconds"] + seconds, 6)
+
+    # --- report ---
+
+    def report(self):
+        totals = dict(self.run_counters)
+        for stage in self.stages:
+            for name, value in stage.counters.items():
+                totals[name] = totals.get(name, 0) + value
+
+        return {
+            "run_id": RUN_ID,
+            "started": self.started,
+            "python": platform.python_version(),
+            "argv": sys.argv,
+            "stages": [s.as_dict() for s in self.stages],
+            "counters": totals,
+        }
+
+    def write_report(self, path=None):
+        """
+        Write the run report as JSON. Separate processes that share EIA_RUN_ID
+        append their stages to the same report file.
+        """
+        if not self.stages:
+            return
+        path = path or REPORT_FILE
+        report = self.report()
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                previous = None
+            if previous and previous.get("run_id") == RUN_ID:
+                report["started"] = previous.get("started", report["started"])
+                report["stages"] = previous.get("stages", []) + report["stages"]
+                for name, value in previous.get("counters", {}).items():
+                    report["counters"][name] = report["counters"].get(name, 0) + value
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stages = []
+        self.run_counters = {}
+
+_recorder = Recorder()
+
+class _StageContext:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _recorder._enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        _recorder._exit()
+        return False
+
+class _SpanContext:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _recorder.add_span(self.name, time.perf_counter() - self.start)
+        return False
+
+def enable(tracemalloc_on=TRACEMALLOC, profile=PROFILE):
+    """Switch instrumentation on for the rest of this process."""
+    _recorder.enable(tracemalloc_on=tracemalloc_on, profile=profile)
+
+def is_enabled():
+    return _recorder.enabled
+
+def stage(name):
+    """Context manager timing a whole pipeline stage."""
+    return _StageContext(name) if _recorder.enabled else _NULL
+
+def span(name):
+    """Context manager timing a sub-step of the current stage. Repeated spans accumulate."""
+    return _SpanContext(name) if _recorder.enabled else _NULL
+
+def count(name, n=1):
+    """Add n to a counter on the current stage (or the run, outside any stage)."""
+    if _recorder.enabled:
+        _recorder.count(name, n)
+
+def instrument(name):
+    """Decorator that runs a stage's main() inside stage(name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return func(*args, **kwargs)
+            with _StageContext(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def write_report(path=None):
+    _recorder.write_report(path)
+
+if ENABLED:
+    enable()
@@ -1,22 +1,22 @@
+import os
+
 import pandas as pd
 import numpy as np
 
+import instrumentation as metrics
+
 # === CONFIGURATION ===
 ELEC_PANEL = "energy_access_panel.csv"
 SEDS_FILE = "seds_expenditure.csv"
 RELIABILITY_FILE = "reliability_by_state_2024.csv"
+EBA_STATE_FILE = "eba_state_annual.csv"  # Optional, from extract_eba_hourly.py
+EBA_MIN_COVERAGE = 0.95                  # Blank EIA-930 totals for state-years below this coverage
 OUTPUT_FILE = "energy_access_master.csv"
 
-def main():
-    print("=== MERGING ENERGY ACCESS DATA ===\n")
-    
-    # === 1. LOAD ELECTRICITY PANEL ===
-    print("Loading electricity panel...")
-    elec = pd.read_csv(ELEC_PANEL)
-    print(f"  Rows: {len(elec):,}")
-    
+def annualize_elec(elec):
+    """Residential monthly panel -> annual state rows with per-customer consumption."""
     # Filter to residential only for access metrics
-    elec_res = elec[elec['sector'] == 'RES'].copy()
+    elec_res = elec[elec['sector'] == 'RES']
     
     # Aggregate monthly to annual
     elec_annual = elec_res.groupby(['geography', 'year']).agg({
@@ -29,13 +29,10 @@ def main():
     
     # Calculate per-customer consumption
     elec_annual['kwh_per_customer'] = (elec_annual['sales_million_kwh'] * 1_000_000) / elec_annual['avg_customers']
-    
-    print(f"  Annual residential rows: {len(elec_annual):,}")
-    print(f"  Years: {elec_annual['year'].min()} - {elec_annual['year'].max()}")
-    
-    # === 2. LOAD SEDS EXPENDITURE ===
-    print("\nLoading SEDS expenditure...")
-    seds = pd.read_csv(SEDS_FILE)
+    return elec_annual
+
+def prepare_seds(seds):
+    seds = seds.copy()
     seds.columns = ['state', 'year', 'total_energy_expend_pc', 'elec_expend_pc', 
                     'elec_expend_billion', 'total_energy_expend_billion']
     
@@ -43,23 +40,19 @@ def main():
     seds['year'] = pd.to_numeric(seds['year'], errors='coerce')
     seds = seds.dropna(subset=['year'])
     seds['year'] = seds['year'].astype(int)
-    
-    print(f"  Rows: {len(seds):,}")
-    print(f"  Years: {int(seds['year'].min())} - {int(seds['year'].max())}")
-    
-    # === 3. LOAD RELIABILITY ===
-    print("\nLoading reliability data...")
-    reliability = pd.read_csv(RELIABILITY_FILE)
+    return seds
+
+def prepare_reliability(reliability):
+    reliability = reliability.copy()
     reliability['year'] = 2024
     reliability = reliability[['state', 'year', 'saidi_wo_med', 'saifi_wo_med', 'total_customers', 'utility_count']]
     reliability.columns = ['state', 'year', 'saidi', 'saifi', 'reliability_customers', 'utility_count']
-    print(f"  States: {len(reliability)}")
-    
-    # === 4. MERGE ALL ===
-    print("\nMerging datasets...")
-    
+    return reliability
+
+def merge_master(elec_annual, seds, reliability, eba=None):
+    """Join the annual electricity panel with SEDS, reliability and (optionally) EIA-930 aggregates."""
     # Start with electricity
-    master = elec_annual.copy()
+    master = elec_annual
     
     # Merge SEDS
     master = master.merge(
@@ -75,27 +68,83 @@ def main():
         how='left'
     )
     
-    # === 5. CALCULATE DERIVED METRICS ===
+    # Merge hourly EIA-930 aggregates if they have been extracted. Totals from
+    # partial years or missing BAs would understate the state, so they are
+    # blanked; the coverage columns are kept to show why. Coverage is blank for
+    # states ba_state_map.csv does not list completely.
+    if eba is not None:
+        eba = eba[['state', 'year', 'eba_demand_mwh', 'eba_peak_demand_mw', 'eba_net_generation_mwh',
+                   'eba_demand_coverage', 'eba_net_generation_coverage']].copy()
+        incomplete_demand = eba['eba_demand_coverage'].fillna(0) < EBA_MIN_COVERAGE
+        eba.loc[incomplete_demand, ['eba_demand_mwh', 'eba_peak_demand_mw']] = np.nan
+        incomplete_generation = eba['eba_net_generation_coverage'].fillna(0) < EBA_MIN_COVERAGE
+        eba.loc[incomplete_generation, 'eba_net_generation_mwh'] = np.nan
+
+        master = master.merge(eba, on=['state', 'year'], how='left')
+    
+    # === CALCULATE DERIVED METRICS ===
     # Estimated annual bill = price * consumption
     master['est_annual_bill'] = (master['avg_price_cents_kwh'] / 100) * master['kwh_per_customer']
+    return master
+
+@metrics.instrument("merge")
+def main():
+    print("=== MERGING ENERGY ACCESS DATA ===\n")
+    
+    # === 1. LOAD ELECTRICITY PANEL ===
+    print("Loading electricity panel...")
+    with metrics.span("read_panel"):
+        elec = pd.read_csv(ELEC_PANEL)
+    print(f"  Rows: {len(elec):,}")
+    
+    elec_annual = annualize_elec(elec)
+    print(f"  Annual residential rows: {len(elec_annual):,}")
+    print(f"  Years: {elec_annual['year'].min()} - {elec_annual['year'].max()}")
+    
+    # === 2. LOAD SEDS EXPENDITURE ===
+    print("\nLoading SEDS expenditure...")
+    seds = prepare_seds(pd.read_csv(SEDS_FILE))
+    print(f"  Rows: {len(seds):,}")
+    print(f"  Years: {int(seds['year'].min())} - {int(seds['year'].max())}")
+    
+    # === 3. LOAD RELIABILITY ===
+    print("\nLoading reliability data...")
+    reliability = prepare_reliability(pd.read_csv(RELIABILITY_FILE))
+    print(f"  States: {len(reliability)}")
+    
+    eba = None
+    if os.path.exists(EBA_STATE_FILE):
+        eba = pd.read_csv(EBA_STATE_FILE)
+        print(f"\nLoaded EIA-930 hourly aggregates: {len(eba):,} state-year rows")
+        print(f"  Below {EBA_MIN_COVERAGE:.0%} demand coverage (blanked): "
+              f"{(eba['eba_demand_coverage'].fillna(0) < EBA_MIN_COVERAGE).sum():,}")
+    
+    # === 4. MERGE ALL + DERIVED METRICS ===
+    print("\nMerging datasets...")
+    with metrics.span("merge"):
+        master = merge_master(elec_annual, seds, reliability, eba)
     
     print(f"\nMaster dataset: {len(master):,} rows")
     print(f"Columns: {list(master.columns)}")
     
-    # === 6. SAVE ===
-    master.to_csv(OUTPUT_FILE, index=False)
+    # === 5. SAVE ===
+    with metrics.span("write_csv"):
+        master.to_csv(OUTPUT_FILE, index=False)
+    metrics.count("rows_written", len(master))
     print(f"\nSaved: {OUTPUT_FILE}")
     
-    # === 7. PREVIEW ===
+    # === 6. PREVIEW ===
     print("\n=== PREVIEW (2024 data) ===")
     preview = master[master['year'] == 2024].sort_values('state').head(10)
     print(preview[['state', 'year', 'avg_price_cents_kwh', 'kwh_per_customer', 
                    'elec_expend_pc', 'saidi', 'saifi']].to_string(index=False))
     
-    # === 8. SUMMARY STATS ===
+    # === 7. SUMMARY STATS ===
     print("\n=== 2024 SUMMARY STATS ===")
     data_2024 = master[master['year'] == 2024]
-    print(f"States with complete data: {data_2024.dropna().shape[0]}")
+    # Optional EIA-930 columns are mostly blank and would shrink this count
+    core_columns = [c for c in data_2024.columns if not c.startswith('eba_')]
+    print(f"States with complete data: {data_2024.dropna(subset=core_columns).shape[0]}")
     print(f"\nPrice (cents/kWh):")
     print(f"  Min: {data_2024['avg_price_cents_kwh'].min():.2f} ({data_2024.loc[data_2024['avg_price_cents_kwh'].idxmin(), 'state']})")
     print(f"  Max: {data_2024['avg_price_cents_kwh'].max():.2f} ({data_2024.loc[data_2024['avg_price_cents_kwh'].idxmax(), 'state']})")
@@ -0,0 +1,153 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import instrumentation as metrics
+from add_energy_burden import add_burden
+from extract_reliability import aggregate_by_state
+from merge_all_data import annualize_elec, merge_master, prepare_reliability, prepare_seds
+
+# === CONFIGURATION ===
+ELEC_PANEL = "energy_access_panel.csv"
+SEDS_FILE = "seds_expenditure.csv"
+RELIABILITY_UTILITY_FILE = "reliability_by_utility.csv"  # Preferred: aggregated per partition
+RELIABILITY_FILE = "reliability_by_state_2024.csv"       # Fallback when no utility file
+EBA_STATE_FILE = "eba_state_annual.csv"                  # Optional
+INCOME_FILE = "state_median_income_2024.csv"
+
+PARTITION_DIR = "partitions"
+OUTPUT_MASTER = "energy_access_master.csv"
+OUTPUT_FILE = "energy_access_with_burden.csv"
+
+CHUNK_SIZE = 200_000            # Rows read per chunk while partitioning
+WORKERS = os.cpu_count() or 1  # Peak memory is roughly WORKERS x the largest partition
+
+def partition_inputs():
+    """input name -> (path, partition key column) for every input present on disk."""
+    reliability = (
+        ("reliability_utility", RELIABILITY_UTILITY_FILE)
+        if os.path.exists(RELIABILITY_UTILITY_FILE)
+        else ("reliability", RELIABILITY_FILE)
+    )
+    inputs = {
+        "elec": (ELEC_PANEL, "geography"),
+        "seds": (SEDS_FILE, "state"),
+        reliability[0]: (reliability[1], "state"),
+        "income": (INCOME_FILE, "state"),
+    }
+    if os.path.exists(EBA_STATE_FILE):
+        inputs["eba"] = (EBA_STATE_FILE, "state")
+    return inputs
+
+def partition_file(name, path, key, partition_dir):
+    """
+    Split one CSV into partition_dir/<name>/<key value>.csv, one chunk at a
+    time. Returns the number of rows written.
+    """
+    out_dir = os.path.join(partition_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    started = set()
+    rows = 0
+
+    for chunk in pd.read_csv(path, chunksize=CHUNK_SIZE, dtype={key: str}):
+        if name == "elec":
+            # Only residential rows feed the annual merge
+            chunk = chunk[chunk['sector'] == 'RES']
+
+        for value, part in chunk.groupby(key, sort=False):
+            part_path = os.path.join(out_dir, f"{value}.csv")
+            part.to_csv(part_path, mode='a', header=value not in started, index=False)
+            started.add(value)
+            rows += len(part)
+
+    return rows
+
+def read_partition(partition_dir, name, state, columns_from):
+    """Read one partition, or an empty frame with the input's columns and dtypes if the state has none."""
+    path = os.path.join(partition_dir, name, f"{state}.csv")
+    if os.path.exists(path):
+        return pd.read_csv(path)
+    return pd.read_csv(columns_from, nrows=1).iloc[0:0]
+
+def process_partition(state, partition_dir, inputs):
+    """
+    Run merge, derived metrics and burden for one state and write its
+    output parts. Runs in a worker process.
+    """
+    def load(name):
+        return read_partition(partition_dir, name, state, inputs[name][0])
+
+    elec_annual = annualize_elec(load("elec"))
+    seds = prepare_seds(load("seds"))
+
+    if "reliability_utility" in inputs:
+        reliability = prepare_reliability(aggregate_by_state(load("reliability_utility")))
+    else:
+        reliability = prepare_reliability(load("reliability"))
+
+    eba = load("eba") if "eba" in inputs else None
+
+    master = merge_master(elec_annual, seds, reliability, eba)
+    with_burden = add_burden(master, load("income"))
+
+    out_dir = os.path.join(partition_dir, "output")
+    master.to_csv(os.path.join(out_dir, f"{state}.master.csv"), index=False)
+    with_burden.to_csv(os.path.join(out_dir, f"{state}.burden.csv"), index=False)
+    return state, len(with_burden)
+
+def concat_parts(paths, output_file):
+    """Stream part files into one CSV, keeping only the first header."""
+    with open(output_file, 'w', encoding='utf-8', newline='') as out:
+        for i, path in enumerate(paths):
+            with open(path, 'r', encoding='utf-8', newline='') as part:
+                header = part.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(part, out)
+
+@metrics.instrument("merge_out_of_core")
+def main():
+    print("=== OUT-OF-CORE MERGE (partitioned by state) ===\n")
+
+    shutil.rmtree(PARTITION_DIR, ignore_errors=True)
+    os.makedirs(os.path.join(PARTITION_DIR, "output"))
+    inputs = partition_inputs()
+
+    # === 1. PARTITION EVERY INPUT BY STATE ===
+    with metrics.span("partition"):
+        for name, (path, key) in inputs.items():
+            rows = partition_file(name, path, key, PARTITION_DIR)
+            print(f"  Partitioned {path}: {rows:,} rows")
+
+    elec_dir = os.path.join(PARTITION_DIR, "elec")
+    states = sorted(f[:-4] for f in os.listdir(elec_dir)) if os.path.isdir(elec_dir) else []
+    if not states:
+        raise SystemExit(f"No residential (RES) rows in {ELEC_PANEL}; nothing to merge.")
+    print(f"\n{len(states)} partitions, {WORKERS} workers\n")
+    metrics.count("partitions", len(states))
+
+    # === 2. MERGE + DERIVED METRICS + BURDEN PER PARTITION ===
+    total_rows = 0
+    with metrics.span("process"), ProcessPoolExecutor(max_workers=WORKERS) as pool:
+        futures = [pool.submit(process_partition, state, PARTITION_DIR, inputs) for state in states]
+        for done, future in enumerate(as_completed(futures), 1):
+            state, rows = future.result()
+            total_rows += rows
+            if done % 10 == 0 or done == len(states):
+                print(f"  Completed {done:,}/{len(states):,} partitions ({total_rows:,} rows)")
+
+    # === 3. STITCH OUTPUTS (state order, streamed) ===
+    out_dir = os.path.join(PARTITION_DIR, "output")
+    with metrics.span("concat"):
+        concat_parts([os.path.join(out_dir, f"{s}.master.csv") for s in states], OUTPUT_MASTER)
+        concat_parts([os.path.join(out_dir, f"{s}.burden.csv") for s in states], OUTPUT_FILE)
+    metrics.count("rows_written", total_rows)
+
+    print(f"\nSaved: {OUTPUT_MASTER}")
+    print(f"Saved: {OUTPUT_FILE}")
+    print(f"  Total rows: {total_rows:,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import csv
+
+import instrumentation as metrics
+
+# Shared by flatten_to_panel.py and extract_seds_burden.py. Each passes its
+# own column list and a panel_rows(panel_data) function yielding rows in
+# that column order.
+
+def write_panel(panel_data, path, columns, panel_rows):
+    """Write a panel dict to CSV with the csv module (no pandas needed)."""
+    with metrics.span("write_csv"), open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(panel_rows(panel_data))
+    metrics.count("rows_written", len(panel_data))
+
+def panel_frame(panel_data, columns, numeric_columns, panel_rows):
+    """The panel as a DataFrame with the same dtypes read_csv gives for the written CSV."""
+    import pandas as pd
+
+    df = pd.DataFrame(panel_rows(panel_data), columns=columns)
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
@@ -0,0 +1,225 @@
+"""
+Single entry point for the eia_extraction pipeline.
+
+    python pipeline.py run                # every stage, in memory
+    python pipeline.py extract --source api
+    python pipeline.py merge --out-of-core
+
+Only argparse and os are imported up front. pandas, numpy and matplotlib
+are imported inside the subcommands that need them, so `--help` and
+argument errors return immediately.
+"""
+import argparse
+import os
+
+def run_script(module_name, source=None):
+    """Import one stage script and run its main() with its own CONFIGURATION."""
+    module = __import__(module_name)
+    if source is not None:
+        module.SOURCE = source
+    module.main()
+
+def cmd_extract(args):
+    run_script("extract_access_series", args.source)
+
+def cmd_extract_seds(args):
+    run_script("extract_seds_burden", args.source)
+
+def cmd_extract_reliability(args):
+    run_script("extract_reliability")
+
+def cmd_extract_eba(args):
+    run_script("extract_eba_hourly")
+
+def cmd_flatten(args):
+    run_script("flatten_to_panel")
+
+def cmd_merge(args):
+    if not args.out_of_core:
+        run_script("merge_all_data")
+        return
+
+    import merge_out_of_core
+    if args.workers:
+        merge_out_of_core.WORKERS = args.workers
+    merge_out_of_core.main()
+
+def cmd_burden(args):
+    run_script("add_energy_burden")
+
+def cmd_visualize(args):
+    run_script("visualize_energy_access")
+
+def cmd_generate(args):
+    from generate_synthetic_data import generate
+
+    summary = generate(args.output_dir, scale=args.scale)
+    print(f"Generated {args.scale}x synthetic inputs in {args.output_dir}/")
+    for key, value in summary.items():
+        print(f"  {key:<16} {value}")
+
+def cmd_run(args):
+    """
+    Run every stage in one process. Series are folded into panels as they
+    are scanned and DataFrames are handed from stage to stage, so nothing
+    is written and re-parsed between stages.
+    """
+    import pandas as pd
+
+    import add_energy_burden
+    import extract_access_series
+    import extract_reliability
+    import extract_seds_burden
+    import flatten_to_panel
+    import instrumentation as metrics
+    import merge_all_data
+
+    extract_access_series.SOURCE = args.source
+    extract_seds_burden.SOURCE = args.source
+    keep = args.write_intermediates
+
+    print("=== RUNNING PIPELINE (in memory) ===\n")
+
+    # === 1. ELECTRICITY: extract + flatten ===
+    with metrics.stage("extract"):
+        if keep:
+            series = extract_access_series.load_series()
+            extract_access_series.write_outputs(series)
+        else:
+            series = extract_access_series.load_series(stream=True)
+        with metrics.span("build_panel"):
+            panel_data = flatten_to_panel.build_panel(series)
+        del series
+
+    with metrics.stage("flatten"):
+        if keep:
+            flatten_to_panel.write_panel(panel_data, flatten_to_panel.OUTPUT_CSV)
+        elec = flatten_to_panel.panel_frame(panel_data)
+        del panel_data
+    print(f"Electricity panel: {len(elec):,} rows\n")
+
+    # === 2. SEDS EXPENDITURE ===
+    with metrics.stage("extract_seds"):
+        seds_series = extract_seds_burden.load_series(stream=not keep)
+        seds_panel = extract_seds_burden.build_panel(seds_series)
+        if keep:
+            extract_seds_burden.write_panel(seds_panel, extract_seds_burden.OUTPUT_CSV)
+        seds = extract_seds_burden.panel_frame(seds_panel)
+        del seds_series, seds_panel
+    print(f"SEDS panel: {len(seds):,} rows\n")
+
+    # === 3. RELIABILITY ===
+    with metrics.stage("extract_reliability"):
+        if os.path.exists(extract_reliability.INPUT_FILE):
+            print(f"Reading {extract_reliability.INPUT_FILE}...")
+            utilities = extract_reliability.load_utilities(extract_reliability.INPUT_FILE)
+            reliability = extract_reliability.aggregate_by_state(utilities)
+            if keep:
+                utilities.to_csv(extract_reliability.OUTPUT_UTILITY, index=False)
+                reliability.to_csv(extract_reliability.OUTPUT_STATE, index=False)
+        else:
+            print(f"Reading {merge_all_data.RELIABILITY_FILE}...")
+            reliability = pd.read_csv(merge_all_data.RELIABILITY_FILE)
+    print(f"Reliability: {len(reliability):,} states\n")
+
+    # === 4. MERGE + DERIVED METRICS ===
+    with metrics.stage("merge"):
+        eba = None
+        if os.path.exists(merge_all_data.EBA_STATE_FILE):
+            eba = pd.read_csv(merge_all_data.EBA_STATE_FILE)
+        master = merge_all_data.merge_master(
+            merge_all_data.annualize_elec(elec),
+            merge_all_data.prepare_seds(seds),
+            merge_all_data.prepare_reliability(reliability),
+            eba,
+        )
+        del elec
+        if keep:
+            master.to_csv(merge_all_data.OUTPUT_FILE, index=False)
+    print(f"Master dataset: {len(master):,} rows")
+
+    # === 5. ENERGY BURDEN ===
+    with metrics.stage("burden"):
+        income = pd.read_csv(add_energy_burden.INCOME_FILE)
+        with_burden = add_energy_burden.add_burden(master, income)
+        with metrics.span("write_csv"):
+            with_burden.to_csv(add_energy_burden.OUTPUT_FILE, index=False)
+        metrics.count("rows_written", len(with_burden))
+    print(f"Saved: {add_energy_burden.OUTPUT_FILE}\n")
+
+    # === 6. VISUALIZE ===
+    if not args.no_visualize:
+        with metrics.stage("visualize"):
+            import visualize_energy_access
+
+            df_2024 = visualize_energy_access.select_2024(with_burden)
+            print(f"Drawing figures for {len(df_2024)} states (2024)...")
+            visualize_energy_access.render(df_2024)
+
+    print("\n=== DONE ===")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pipeline.py",
+        description="EIA energy access pipeline: extract, flatten, merge, burden and visualize.",
+    )
+    parser.add_argument("-C", "--workdir", help="Directory holding inputs and outputs (default: current)")
+    parser.add_argument("--metrics", action="store_true", help="Record a run report (see instrumentation.py)")
+    parser.add_argument("--profile", action="store_true", help="Also capture cProfile output (implies --metrics)")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    def add(name, func, help_text):
+        p = sub.add_parser(name, help=help_text, description=help_text)
+        p.set_defaults(func=func)
+        return p
+
+    for name, func, help_text in [
+        ("extract", cmd_extract, "Extract ELEC access series from elec.txt (or the API)"),
+        ("extract-seds", cmd_extract_seds, "Extract SEDS expenditure series from SEDS.txt (or the API)"),
+    ]:
+        add(name, func, help_text).add_argument("--source", choices=["bulk", "api"])
+
+    add("extract-reliability", cmd_extract_reliability, "Aggregate the EIA-861 reliability workbook")
+    add("extract-eba", cmd_extract_eba, "Aggregate hourly EIA-930 series from EBA.txt")
+    add("flatten", cmd_flatten, "Flatten extracted ELEC series into the monthly panel")
+    merge = add("merge", cmd_merge, "Merge panel, SEDS and reliability into the master dataset")
+    merge.add_argument("--out-of-core", action="store_true",
+                       help="Partition by state and merge (plus burden) in a worker pool")
+    merge.add_argument("--workers", type=int, metavar="N",
+                       help="Worker processes for --out-of-core (default: CPU count); "
+                            "peak memory is roughly N x the largest state partition")
+    add("burden", cmd_burden, "Add energy burden to the master dataset")
+    add("visualize", cmd_visualize, "Draw the dashboard figures")
+
+    gen = add("generate", cmd_generate, "Write synthetic bulk-file inputs for testing and benchmarks")
+    gen.add_argument("--scale", type=float, default=1, help="Scale factor (default: 1)")
+    gen.add_argument("--output-dir", default="synthetic", help="Where to write (default: synthetic)")
+
+    run = add("run", cmd_run, "Run every stage in one process, passing data in memory")
+    run.add_argument("--source", choices=["bulk", "api"], default="bulk")
+    run.add_argument("--write-intermediates", action="store_true",
+                     help="Also write each stage's usual output file")
+    run.add_argument("--no-visualize", action="store_true", help="Skip drawing figures")
+
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if getattr(args, "workers", None) is not None:
+        if not args.out_of_core:
+            parser.error("--workers only applies with --out-of-core")
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+
+    if args.workdir:
+        os.chdir(args.workdir)
+    if args.metrics or args.profile:
+        import instrumentation
+        instrumentation.enable(profile=args.profile)
+
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,29 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 
+import instrumentation as metrics
+
 # === CONFIGURATION ===
 DATA_FILE = "energy_access_with_burden.csv"
 OUTPUT_DIR = "./"
 
-# Set style
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['axes.labelsize'] = 11
+def setup_style():
+    """Applied when figures are drawn rather than at import, so importing stays cheap."""
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.size'] = 10
+    plt.rcParams['axes.titlesize'] = 14
+    plt.rcParams['axes.labelsize'] = 11
 
-def load_data():
-    df = pd.read_csv(DATA_FILE)
+def select_2024(df):
     df_2024 = df[df['year'] == 2024].copy()
     # Remove regional aggregates (keep only 2-letter state codes)
     df_2024 = df_2024[df_2024['state'].str.len() == 2]
     return df_2024
 
+def load_data():
+    return select_2024(pd.read_csv(DATA_FILE))
+
 def fig1_energy_burden_ranking(df):
     """Horizontal bar chart of energy burden by state"""
     fig, ax = plt.subplots(figsize=(10, 12))
@@ -164,17 +169,31 @@ def fig5_consumption_by_state(df):
     print("Saved: consumption_ranking.png/svg")
     plt.close()
 
+FIGURES = [
+    fig1_energy_burden_ranking,
+    fig2_price_vs_burden,
+    fig3_reliability_ranking,
+    fig4_access_dashboard,
+    fig5_consumption_by_state,
+]
+
+def render(df):
+    """Draw every figure for a 2024 state frame (as returned by select_2024)."""
+    setup_style()
+    for figure in FIGURES:
+        with metrics.span(figure.__name__):
+            figure(df)
+        metrics.count("figures_written")
+
+@metrics.instrument("visualize")
 def main():
     print("=== GENERATING ENERGY ACCESS VISUALIZATIONS ===\n")
     
-    df = load_data()
+    with metrics.span("load_data"):
+        df = load_data()
     print(f"Loaded {len(df)} states for 2024\n")
     
-    fig1_energy_burden_ranking(df)
-    fig2_price_vs_burden(df)
-    fig3_reliability_ranking(df)
-    fig4_access_dashboard(df)
-    fig5_consumption_by_state(df)
+    render(df)
     
     print("\n=== DONE ===")
     print("Generated 5 visualizations (PNG + SVG)")